@@ -5,6 +5,12 @@ import random
 import time
 import sys
 import threading
+import asyncio
+import queue
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
 import math
 from typing import Tuple, Optional
 
@@ -20,7 +26,38 @@ def receive_common_info(f_obj) -> Tuple[int, int]:
     modulus = int(f_obj.readline().strip())
     return base, modulus
 
-def dh_exchange_server(server_address: str, server_port: int) -> Tuple[int, int, int, int]:
+def serve_dh_exchange(conn: socket.socket, rng=random, verbose: bool = True) -> Tuple[int, int, int, int]:
+    """Run the server half of one exchange over an already accepted connection."""
+    with conn.makefile('r', encoding='utf-8') as f_obj:
+        base, modulus = receive_common_info(f_obj)
+        if verbose:
+            print(f"Received base={base}, modulus={modulus}")
+
+        secret_key = rng.randint(2, max(2, modulus - 2))
+        if verbose:
+            print(f"Secret is {secret_key}")
+
+        public_value = pow(base, secret_key, modulus)
+
+        line = f_obj.readline()
+        client_public_value = int(line.strip())
+        conn.sendall(f"{public_value}\n".encode())
+        shared_secret = pow(client_public_value, secret_key, modulus)
+        return base, modulus, secret_key, shared_secret
+
+def primes_for_size(prime_size: str) -> list:
+    """Candidate moduli the client picks from for a given --prime-size."""
+    if prime_size == "small":
+        return SMALL_PRIMES
+    elif prime_size == "medium":
+        return MEDIUM_PRIMES
+    elif prime_size == "large":
+        return LARGE_PRIMES
+    elif prime_size == "very_large":
+        return [VERY_LARGE_PRIME]
+    return SMALL_PRIMES
+
+def dh_exchange_server(server_address: str, server_port: int, rng=random, verbose: bool = True) -> Tuple[int, int, int, int]:
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         sock.bind((server_address, server_port))
@@ -28,38 +65,15 @@ def dh_exchange_server(server_address: str, server_port: int) -> Tuple[int, int,
 
         conn, addr = sock.accept()
         with conn:
-            print(f"Connected by {addr}")
-            
-            with conn.makefile('r', encoding='utf-8') as f_obj:
-                base, modulus = receive_common_info(f_obj)
-                print(f"Received base={base}, modulus={modulus}")
-    
-                secret_key = random.randint(2, max(2, modulus - 2))
-                print(f"Secret is {secret_key}")
-                
-                public_value = pow(base, secret_key) % modulus
-    
-                line = f_obj.readline()
-                client_public_value = int(line.strip())
-                conn.sendall(f"{public_value}\n".encode())
-                shared_secret = pow(client_public_value, secret_key) % modulus
-                return base, modulus, secret_key, shared_secret
-
-def send_common_info(sock: socket.socket, server_address: str, server_port: int, prime_size: str = "small") -> Tuple[int, int]:
+            if verbose:
+                print(f"Connected by {addr}")
+            return serve_dh_exchange(conn, rng, verbose)
+
+def send_common_info(sock: socket.socket, server_address: str, server_port: int, prime_size: str = "small", rng=random) -> Tuple[int, int]:
     """Send base and modulus proposal to server."""
-    if prime_size == "small":
-        primes = SMALL_PRIMES
-    elif prime_size == "medium":
-        primes = MEDIUM_PRIMES
-    elif prime_size == "large":
-        primes = LARGE_PRIMES
-    elif prime_size == "very_large":
-        primes = [VERY_LARGE_PRIME]
-    else:
-        primes = SMALL_PRIMES
-    
-    modulus = random.choice(primes)
-    base = random.randint(2, modulus - 1)
+    primes = primes_for_size(prime_size)
+    modulus = rng.choice(primes)
+    base = rng.randint(2, modulus - 1)
     
     message = f"{base}\n{modulus}\n"
     sock.sendall(message.encode())
@@ -67,36 +81,185 @@ def send_common_info(sock: socket.socket, server_address: str, server_port: int,
     return base, modulus
 
 
-def dh_exchange_client(server_address: str, server_port: int, prime_size: str = "small") -> Tuple[int, int, int, int]:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        try:
-            sock.connect((server_address, server_port))
-            
-            base, modulus = send_common_info(sock, server_address, server_port, prime_size)
-            print(f"Sent base={base}, modulus={modulus}")
+def run_dh_client(sock: socket.socket, prime_size: str = "small", rng=random,
+                  verbose: bool = True) -> Tuple[int, int, int, int]:
+    """Run the client half of one exchange over an already connected socket."""
+    server_address, server_port = sock.getpeername()[:2]
+    base, modulus = send_common_info(sock, server_address, server_port, prime_size, rng)
+    if verbose:
+        print(f"Sent base={base}, modulus={modulus}")
 
-            secret_key = random.randint(2, max(2, modulus - 2))
-            print(f"Secret is {secret_key}")
+    secret_key = rng.randint(2, max(2, modulus - 2))
+    if verbose:
+        print(f"Secret is {secret_key}")
 
-            public_value = pow(base, secret_key) % modulus
+    public_value = pow(base, secret_key, modulus)
+
+    sock.sendall(f"{public_value}\n".encode())
+    
+    with sock.makefile('r', encoding='utf-8') as f_obj:
+        line = f_obj.readline()
+        server_public_value = int(line.strip())
+    
+    if verbose:
+        print(f"Int received from peer is {server_public_value}")
+
+    shared_secret = pow(server_public_value, secret_key, modulus)
+    if verbose:
+        print(f"Shared secret is {shared_secret}")
+    
+    return base, modulus, secret_key, shared_secret
 
-            sock.sendall(f"{public_value}\n".encode())
-            
-            with sock.makefile('r', encoding='utf-8') as f_obj:
-                line = f_obj.readline()
-                server_public_value = int(line.strip())
-            
-            print(f"Int received from peer is {server_public_value}")
 
-            shared_secret = pow(server_public_value, secret_key) % modulus
-            print(f"Shared secret is {shared_secret}")
-            
-            return base, modulus, secret_key, shared_secret
+def dh_exchange_client(server_address: str, server_port: int, prime_size: str = "small",
+                       rng=random, verbose: bool = True) -> Tuple[int, int, int, int]:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            # Both protocol messages are tiny; don't let Nagle hold the second one back
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.connect((server_address, server_port))
+            return run_dh_client(sock, prime_size, rng, verbose)
         except (ConnectionRefusedError, ValueError) as e:
             print(f"Error: {e}")
             return (0, 0, 0, 0)
 
 
+class ExchangeHarness:
+    """In-process DH server that reuses one listener across many exchanges.
+
+    The listener binds port 0 so parallel runs never collide, and the server
+    thread sets ``ready`` once it is accepting, so callers never have to sleep.
+    Each call to :meth:`exchange` runs one full TCP exchange against it.
+    Server results are tagged with the client's address, so a result that
+    arrives after its exchange timed out is discarded rather than handed to
+    the next exchange.
+    """
+
+    def __init__(self, address: str = "127.0.0.1", timeout: float = 2.0):
+        self.address = address
+        self.port = 0
+        self.timeout = timeout
+        self.ready = threading.Event()
+        self._results: "queue.Queue[Tuple[Tuple[str, int], Optional[Tuple[int, int, int, int]]]]" = queue.Queue()
+        self._server_rng = random
+        self._verbose = True
+        self._stopping = False
+        self._listener: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ExchangeHarness":
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.bind((self.address, 0))
+        self._listener.listen(128)
+        self.port = self._listener.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self.ready.wait()
+        return self
+
+    def _serve(self):
+        self.ready.set()
+        while True:
+            conn, addr = self._listener.accept()
+            if self._stopping:
+                conn.close()
+                return
+            with conn:
+                # A stalled client must not wedge the server thread (or close())
+                conn.settimeout(self.timeout)
+                try:
+                    result = serve_dh_exchange(conn, self._server_rng, self._verbose)
+                except (OSError, ValueError) as e:
+                    if self._verbose:
+                        print(f"Server error: {e}")
+                    result = None
+            self._results.put((addr, result))
+
+    def _client(self, prime_size: str, rng, verbose: bool):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect((self.address, self.port))
+                local = sock.getsockname()
+                return local, run_dh_client(sock, prime_size, rng, verbose)
+            except (OSError, ValueError) as e:
+                if verbose:
+                    print(f"Error: {e}")
+                return None, (0, 0, 0, 0)
+
+    def exchange(self, prime_size: str = "small", client_rng=random, server_rng=random,
+                 verbose: bool = True):
+        """Run one exchange; returns (client_result, server_result)."""
+        self._server_rng = server_rng
+        self._verbose = verbose
+        local, client_result = self._client(prime_size, client_rng, verbose)
+        if local is None:
+            return client_result, None
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                addr, server_result = self._results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return client_result, None
+            # Anything else is a late result from an exchange that already timed out
+            if addr == local:
+                return client_result, server_result
+
+    def seeded_exchange(self, seed: int, prime_size: str = "small", verbose: bool = False):
+        """Deterministic exchange: each side gets its own generator derived from seed."""
+        return self.exchange(prime_size,
+                             client_rng=random.Random(seed),
+                             server_rng=random.Random(f"server-{seed}"),
+                             verbose=verbose)
+
+    def close(self):
+        if self._listener is None:
+            return
+        # accept() does not notice the listener closing, so wake it with a connection
+        self._stopping = True
+        try:
+            with socket.create_connection((self.address, self.port), timeout=self.timeout):
+                pass
+        except OSError:
+            pass
+        # The server thread is a daemon and its connections time out, so don't wait forever
+        self._thread.join(timeout=self.timeout)
+        self._listener.close()
+        self._listener = None
+
+    def __enter__(self) -> "ExchangeHarness":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark_exchanges(count: int, prime_size: str = "small") -> float:
+    """Run ``count`` seeded exchanges on one harness and report exchanges/second."""
+    print(f"\nRunning {count} seeded exchanges ({prime_size} primes)...")
+    primes = primes_for_size(prime_size)
+    failures = 0
+    degenerate = 0
+    with ExchangeHarness() as harness:
+        start = time.time()
+        for seed in range(count):
+            client_result, server_result = harness.seeded_exchange(seed, prime_size)
+            if server_result is not None and client_result[3] == server_result[3]:
+                continue
+            # Seeds that draw modulus 2 leave no valid base, so the client bails out by design
+            if random.Random(seed).choice(primes) == 2:
+                degenerate += 1
+            else:
+                failures += 1
+        elapsed = max(time.time() - start, 0.000001)
+
+    rate = count / elapsed
+    print(f"Exchanges: {count} in {elapsed:.4f}s ({rate:.0f} exchanges/second), "
+          f"{degenerate} skipped (modulus 2), {failures} failed")
+    return rate
+
+
 def crack_dh_bruteforce(base: int, modulus: int, public_value: int) -> Optional[int]:
     print(f"Attempting to crack: base={base}, modulus={modulus}, public_value={public_value}")
     print(f"Trying all possible secret keys from 2 to {modulus}...")
@@ -119,8 +282,257 @@ def crack_dh_bruteforce(base: int, modulus: int, public_value: int) -> Optional[
     return None
 
 
+def _kangaroo_worker(worker_id: int, base: int, modulus: int, public_value: int,
+                     secret_min: int, width: int, jumps: list, dp_mask: int,
+                     max_trail: int, reports, stop):
+    """Run one tame and one wild kangaroo, reporting distinguished points.
+
+    A tame kangaroo starts at a known exponent in the interval; a wild one
+    starts at public_value * g^r with r in [-width/2, width/2]. Both walk
+    with jumps chosen by the current group element, and restart from a fresh
+    start whenever they reach a distinguished point (or wander too long
+    without one, e.g. in a short cycle). Each worker keeps O(1) state; the parent owns the shared
+    distinguished point table.
+    """
+    reports.cancel_join_thread()
+    rng = random.Random(f"kangaroo-{worker_id}-{secret_min}-{width}")
+    jump_powers = [pow(base, jump, modulus) for jump in jumps]
+    jump_count = len(jumps)
+
+    def fresh(tame: bool) -> list:
+        if tame:
+            exponent = secret_min + rng.randrange(width)
+            return [pow(base, exponent, modulus), exponent, tame, 0]
+        # Centre wild starts on the secret so they overlap the tame range by
+        # about half its width wherever the secret lies in the interval
+        exponent = rng.randrange(width + 1) - width // 2
+        return [public_value * pow(base, exponent, modulus) % modulus, exponent, tame, 0]
+
+    herd = [fresh(True), fresh(False)]
+    while not stop.is_set():
+        points = []
+        for _ in range(1024):
+            for kangaroo in herd:
+                position = kangaroo[0]
+                if position & dp_mask == 0:
+                    points.append((position, kangaroo[2], kangaroo[1]))
+                    kangaroo[:] = fresh(kangaroo[2])
+                elif kangaroo[3] > max_trail:
+                    kangaroo[:] = fresh(kangaroo[2])
+                else:
+                    index = position % jump_count
+                    kangaroo[0] = position * jump_powers[index] % modulus
+                    kangaroo[1] += jumps[index]
+                    kangaroo[3] += 1
+        reports.put((2048, points))
+
+
+def crack_dh_kangaroo(base: int, modulus: int, public_value: int,
+                      secret_min: int, secret_max: int,
+                      workers: Optional[int] = None) -> Optional[int]:
+    """Pollard's kangaroo (lambda) for a secret known to lie in [secret_min, secret_max].
+
+    Runs in O(sqrt(secret_max - secret_min)) group operations. Workers each
+    walk a tame/wild pair and send distinguished points back here; a tame and
+    a wild kangaroo landing on the same distinguished point reveal the secret.
+    """
+    width = secret_max - secret_min + 1
+    print(f"Attempting to crack: base={base}, modulus={modulus}, public_value={public_value}")
+    print(f"Kangaroo search over secrets [{secret_min}, {secret_max}] (width {width})")
+    if width <= 0:
+        print("Empty secret interval")
+        return None
+    if math.gcd(base, modulus) != 1:
+        # Wild kangaroos need g^-r, which doesn't exist for a non-invertible base
+        print(f"Base {base} is not invertible mod {modulus}")
+        return None
+
+    start_time = time.time()
+
+    # Tiny intervals aren't worth spinning up processes for
+    if width <= 4096:
+        for secret_candidate in range(secret_min, secret_max + 1):
+            if pow(base, secret_candidate, modulus) == public_value:
+                print(f"SUCCESS! Found secret key: {secret_candidate}")
+                return secret_candidate
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    root = math.isqrt(width)
+    # Mean jump around sqrt(width) / 2, split across the parallel herds
+    jump_bits = max(1, (root // (2 * workers)).bit_length())
+    jumps = [1 << i for i in range(jump_bits)]
+    # Roughly sqrt(width) / 2^dp_bits distinguished points get stored
+    dp_bits = max(0, root.bit_length() // 2 - 1)
+    dp_mask = (1 << dp_bits) - 1
+    max_trail = 20 << dp_bits
+    max_steps = 64 * (root + (workers << dp_bits))
+
+    ctx = multiprocessing.get_context()
+    reports = ctx.Queue()
+    stop = ctx.Event()
+    procs = [
+        ctx.Process(
+            target=_kangaroo_worker,
+            args=(i, base, modulus, public_value, secret_min, width, jumps,
+                  dp_mask, max_trail, reports, stop),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+
+    # distinguished point -> (is_tame, exponent)
+    distinguished = {}
+    found = None
+    steps = 0
+    order = modulus - 1
+    try:
+        while found is None and steps < max_steps:
+            try:
+                step_count, points = reports.get(timeout=1)
+            except queue.Empty:
+                if all(proc.exitcode is not None for proc in procs):
+                    print(f"All kangaroo workers exited (exit codes {[proc.exitcode for proc in procs]})")
+                    return None
+                continue
+            steps += step_count
+            for position, tame, exponent in points:
+                seen = distinguished.get(position)
+                if seen is None:
+                    distinguished[position] = (tame, exponent)
+                    continue
+                if seen[0] == tame:
+                    continue
+                tame_exponent, wild_exponent = (exponent, seen[1]) if tame else (seen[1], exponent)
+                candidate = (tame_exponent - wild_exponent) % order
+                if pow(base, candidate, modulus) == public_value:
+                    found = candidate
+                    break
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(timeout=1)
+            if proc.is_alive():
+                proc.terminate()
+
+    elapsed = max(time.time() - start_time, 0.000001)
+    print(f"Steps: {steps} in {elapsed:.4f}s ({steps / elapsed:.2e} steps/second), "
+          f"{len(distinguished)} distinguished points stored")
+    if found is None:
+        print("Kangaroos never met; is the secret really inside the interval?")
+        return None
+    print(f"SUCCESS! Found secret key: {found}")
+    return found
+
+
+CHAIN_TABLE_MAGIC = b"DHCHAIN1"
+
+
+def _chain_end(base: int, modulus: int, width: int, start: int, chain_length: int) -> int:
+    """Walk x -> R_j(g^x mod p) for j = 0 .. chain_length - 1 and return the end."""
+    exponent = start
+    for column in range(chain_length):
+        exponent = (pow(base, exponent, modulus) + column) % width
+    return exponent
+
+
+def _build_chain_range(task) -> list:
+    base, modulus, width, chain_length, first, last = task
+    return [(_chain_end(base, modulus, width, index, chain_length), index)
+            for index in range(first, last)]
+
+
+def build_chain_table(base: int, modulus: int, path: str, chain_count: int,
+                      chain_length: int, workers: Optional[int] = None) -> int:
+    """Precompute rainbow chains for x -> g^x mod p and write them to ``path``.
+
+    Chains start at exponents 0 .. chain_count - 1 and use the column-indexed
+    reduction R_j(y) = (y + j) mod (p - 1). Only (end, start index) pairs are
+    kept, sorted by end, with chains that merged into the same end dropped.
+    Roughly chain_count * chain_length exponents are covered; a lookup costs
+    about chain_length^2 / 2 exponentiations, so longer chains mean a smaller
+    file and slower queries. Returns the number of chains written.
+    """
+    width = modulus - 1
+    chain_count = min(chain_count, width, 2**32)
+    print(f"Building {chain_count} chains of length {chain_length} for g={base}, p={modulus}...")
+    start_time = time.time()
+
+    chunk = max(1, chain_count // ((workers or os.cpu_count() or 1) * 8))
+    tasks = [(base, modulus, width, chain_length, first, min(first + chunk, chain_count))
+             for first in range(0, chain_count, chunk)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        chains = [chain for part in pool.map(_build_chain_range, tasks) for chain in part]
+    chains.sort()
+
+    end_size = (width.bit_length() + 7) // 8
+    header = f"{base} {modulus} {chain_length} {end_size}\n".encode()
+    written = 0
+    previous_end = None
+    with open(path, "wb") as f_obj:
+        f_obj.write(CHAIN_TABLE_MAGIC)
+        f_obj.write(header)
+        for end, index in chains:
+            if end == previous_end:
+                continue
+            previous_end = end
+            f_obj.write(end.to_bytes(end_size, "big") + index.to_bytes(4, "big"))
+            written += 1
+
+    elapsed = time.time() - start_time
+    print(f"Wrote {written} chains ({chain_count - written} merged) to {path} in {elapsed:.4f}s")
+    return written
+
+
+class ChainTable:
+    """A precomputed chain table loaded from disk for one (g, p) group."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f_obj:
+            if f_obj.read(len(CHAIN_TABLE_MAGIC)) != CHAIN_TABLE_MAGIC:
+                raise ValueError(f"{path} is not a chain table")
+            base, modulus, chain_length, end_size = map(int, f_obj.readline().split())
+            payload = f_obj.read()
+        self.base = base
+        self.modulus = modulus
+        self.chain_length = chain_length
+        self.width = modulus - 1
+        record = end_size + 4
+        self.ends = {
+            int.from_bytes(payload[i:i + end_size], "big"): int.from_bytes(payload[i + end_size:i + record], "big")
+            for i in range(0, len(payload), record)
+        }
+
+    def covers(self, base: int, modulus: int) -> bool:
+        return self.base == base and self.modulus == modulus
+
+    def lookup(self, public_value: int) -> Optional[int]:
+        """Return x with g^x = public_value if some chain in the table covers it."""
+        base, modulus, width, chain_length = self.base, self.modulus, self.width, self.chain_length
+        # Try the target in every column, starting from the cheapest (last) one
+        for column in range(chain_length - 1, -1, -1):
+            exponent = (public_value + column) % width
+            for later in range(column + 1, chain_length):
+                exponent = (pow(base, exponent, modulus) + later) % width
+            start = self.ends.get(exponent)
+            if start is None:
+                continue
+            # Rebuild the chain up to the column; a merge elsewhere gives a false alarm
+            candidate = start
+            for step in range(column):
+                candidate = (pow(base, candidate, modulus) + step) % width
+            if pow(base, candidate, modulus) == public_value:
+                return candidate
+        return None
+
+
 def crack_dh_with_shared_secret(base: int, modulus: int, 
-                                 client_public: int, server_public: int) -> Optional[int]:
+                                 client_public: int, server_public: int,
+                                 secret_min: Optional[int] = None, secret_max: Optional[int] = None,
+                                 workers: Optional[int] = None,
+                                 table: Optional[ChainTable] = None) -> Optional[int]:
     print("="*70)
     print(f"Public Information:")
     print(f"  Base (g):            {base}")
@@ -131,14 +543,32 @@ def crack_dh_with_shared_secret(base: int, modulus: int,
     
     # Crack the client's secret key
     print("Cracking client's secret key...")
-    client_secret = crack_dh_bruteforce(base, modulus, client_public)
+    client_secret = None
+    if table is not None and table.covers(base, modulus):
+        start = time.time()
+        client_secret = table.lookup(client_public)
+        elapsed = time.time() - start
+        if client_secret is not None:
+            print(f"SUCCESS! Chain table gave secret key {client_secret} in {elapsed:.4f}s")
+        else:
+            print(f"Chain table miss after {elapsed:.4f}s, falling back to search")
+
+    if client_secret is None and (secret_min is not None or secret_max is not None):
+        client_secret = crack_dh_kangaroo(
+            base, modulus, client_public,
+            2 if secret_min is None else secret_min,
+            modulus - 2 if secret_max is None else secret_max,
+            workers,
+        )
+    elif client_secret is None:
+        client_secret = crack_dh_bruteforce(base, modulus, client_public)
     
     if client_secret is None:
         print("Failed to crack client secret!")
         return None
     
     # Compute shared secret using cracked client secret and server public value
-    shared_secret = pow(server_public, client_secret) % modulus
+    shared_secret = pow(server_public, client_secret, modulus)
     
     print(f"Shared secret = {server_public}^{client_secret} mod {modulus} = {shared_secret}")
     
@@ -149,6 +579,277 @@ def crack_dh_with_shared_secret(base: int, modulus: int,
     return shared_secret
 
 
+# Shared with the pool's workers by _init_seed_search
+_seed_progress = None
+_seed_stop = None
+
+# Seeds a worker searches between progress updates and stop checks
+SEED_PROGRESS_INTERVAL = 256
+
+
+def _init_seed_search(progress, stop):
+    global _seed_progress, _seed_stop
+    _seed_progress = progress
+    _seed_stop = stop
+
+
+def _search_seed_chunk(task) -> Optional[Tuple[int, int]]:
+    """Replay the client's RNG calls for every seed in [start, stop).
+
+    Mirrors send_common_info followed by secret generation in
+    dh_exchange_client: choice(primes), randint(2, p - 1), randint(2, p - 2).
+    Seeds searched are added to the shared progress counter as the chunk
+    runs, so the parent can report a true rate even if it stops early.
+    Returns (seed, secret) or None.
+    """
+    start, stop, primes, base, modulus, public_value = task
+    rng = random.Random()
+    counted = start
+    for seed in range(start, stop):
+        if seed - counted >= SEED_PROGRESS_INTERVAL:
+            with _seed_progress.get_lock():
+                _seed_progress.value += seed - counted
+            counted = seed
+            if _seed_stop.is_set():
+                return None
+        rng.seed(seed)
+        # Reject on the cheap draws before doing any modular exponentiation
+        if rng.choice(primes) != modulus:
+            continue
+        if rng.randint(2, modulus - 1) != base:
+            continue
+        secret = rng.randint(2, max(2, modulus - 2))
+        if pow(base, secret, modulus) == public_value:
+            with _seed_progress.get_lock():
+                _seed_progress.value += seed - counted + 1
+            return seed, secret
+    with _seed_progress.get_lock():
+        _seed_progress.value += stop - counted
+    return None
+
+
+def crack_dh_seed_space(base: int, modulus: int, client_public: int, server_public: int,
+                        seed_min: int = 0, seed_max: int = 2**32, prime_size: str = "small",
+                        workers: Optional[int] = None, chunk_size: int = 100000) -> Optional[int]:
+    """Recover the client's secret by enumerating the PRNG seed it was run with.
+
+    Clients seed MT19937 with a small integer (--seed), so for large moduli
+    walking the seed range is far cheaper than a discrete log. The range is
+    split into chunks and searched across a process pool.
+    """
+    print(f"Searching seeds [{seed_min}, {seed_max}) for g={base}, p={modulus}, A={client_public}")
+    primes = primes_for_size(prime_size)
+    if modulus not in primes:
+        print(f"Modulus {modulus} is not one the client picks with --prime-size {prime_size}")
+        return None
+
+    tasks = ((start, min(start + chunk_size, seed_max), primes, base, modulus, client_public)
+             for start in range(seed_min, seed_max, chunk_size))
+
+    found = None
+    progress = multiprocessing.Value("Q", 0)
+    stop = multiprocessing.Event()
+    start_time = time.time()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_seed_search,
+                                                initargs=(progress, stop)) as pool:
+        # Keep only a few chunks per worker in flight rather than queueing the whole range
+        window = 4 * (workers or os.cpu_count() or 1)
+        in_flight = {pool.submit(_search_seed_chunk, task) for task in itertools.islice(tasks, window)}
+        while in_flight and found is None:
+            done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                hit = future.result()
+                if hit is not None and found is None:
+                    found = hit
+            if found is None:
+                for task in itertools.islice(tasks, len(done)):
+                    in_flight.add(pool.submit(_search_seed_chunk, task))
+        # Measure before leaving the pool, which waits for chunks still running;
+        # the counter includes seeds from in-flight chunks, not just finished ones
+        elapsed = max(time.time() - start_time, 0.000001)
+        seeds_tried = progress.value
+        stop.set()
+        for future in in_flight:
+            future.cancel()
+
+    print(f"Seeds tried: {seeds_tried} in {elapsed:.4f}s ({seeds_tried / elapsed:.2e} seeds/second)")
+    if found is None:
+        print("No seed in range reproduces the observed exchange")
+        return None
+
+    seed, client_secret = found
+    shared_secret = pow(server_public, client_secret, modulus)
+    print(f"SUCCESS! Seed {seed} gives client secret {client_secret}")
+    print("\n" + "="*70)
+    print(f"CRACKED SHARED SECRET: {shared_secret}")
+    print("="*70)
+    return shared_secret
+
+
+# The baby-step table holds ~2^(bits/2) entries; past this the relay gives up
+RELAY_MAX_MODULUS_BITS = 36
+
+
+def discrete_log_bsgs(base: int, modulus: int, public_value: int) -> Optional[int]:
+    """Quiet baby-step giant-step solver used by the relay's cracking pool.
+
+    Memory grows with sqrt(modulus), so callers must bound the modulus size.
+    """
+    step = math.isqrt(modulus - 1) + 1
+    baby = {}
+    value = 1
+    for j in range(step):
+        baby.setdefault(value, j)
+        value = value * base % modulus
+    # giant = g^-step
+    giant = pow(base, -step, modulus)
+    value = public_value
+    for i in range(step):
+        j = baby.get(value)
+        if j is not None:
+            return i * step + j
+        value = value * giant % modulus
+    return None
+
+
+def _crack_captured(base: int, modulus: int, client_public: int, server_public: int) -> Optional[Tuple[int, int]]:
+    client_secret = discrete_log_bsgs(base, modulus, client_public)
+    if client_secret is None:
+        return None
+    return client_secret, pow(server_public, client_secret, modulus)
+
+
+# Longest line the relay will buffer while looking for a value; past this
+# it stops parsing that direction and just forwards
+RELAY_MAX_LINE = 4096
+
+
+async def _relay_pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                      values: list, wanted: int, on_value) -> None:
+    """Forward bytes as they arrive, parsing the first ``wanted`` integer lines on the side."""
+    pending = b""
+    parsing = True
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                # Pass the half-close on; the peer may still be sending the other way
+                if writer.can_write_eof():
+                    writer.write_eof()
+                else:
+                    writer.close()
+                return
+            # Forward first; parsing must never delay the peers
+            writer.write(chunk)
+            await writer.drain()
+            if not parsing:
+                continue
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                try:
+                    values.append(int(line.strip()))
+                except ValueError:
+                    continue
+                on_value()
+                if len(values) >= wanted:
+                    break
+            if len(values) >= wanted or len(pending) > RELAY_MAX_LINE:
+                parsing = False
+                pending = b""
+    except ConnectionError:
+        # One leg failed: tear the other down too so its pipe sees EOF
+        writer.close()
+
+
+async def _relay_connection(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter,
+                            upstream: Tuple[str, int], pool: concurrent.futures.Executor,
+                            pending_cracks: set) -> None:
+    peer = client_writer.get_extra_info("peername")
+    try:
+        server_reader, server_writer = await asyncio.open_connection(*upstream)
+    except OSError as e:
+        print(f"[relay] {peer}: cannot reach {upstream[0]}:{upstream[1]}: {e}")
+        client_writer.close()
+        return
+    for writer in (client_writer, server_writer):
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    # Client sends base, modulus, then its public value; the server answers with its own
+    client_values = []
+    server_values = []
+    loop = asyncio.get_running_loop()
+    submitted = False
+
+    def on_value():
+        nonlocal submitted
+        if len(client_values) != 3 or len(server_values) != 1 or submitted:
+            return
+        submitted = True
+        base, modulus, client_public = client_values
+        server_public = server_values[0]
+        captured_at = time.perf_counter()
+        print(f"[relay] {peer}: captured g={base}, p={modulus}, A={client_public}, B={server_public}")
+        if modulus.bit_length() > RELAY_MAX_MODULUS_BITS:
+            print(f"[relay] {peer}: {modulus.bit_length()}-bit modulus is too large to crack "
+                  f"(limit {RELAY_MAX_MODULUS_BITS} bits)")
+            return
+        crack = loop.run_in_executor(pool, _crack_captured, base, modulus, client_public, server_public)
+        task = asyncio.ensure_future(_report_crack(peer, crack, captured_at))
+        pending_cracks.add(task)
+        task.add_done_callback(pending_cracks.discard)
+
+    await asyncio.gather(
+        _relay_pipe(client_reader, server_writer, client_values, 3, on_value),
+        _relay_pipe(server_reader, client_writer, server_values, 1, on_value),
+    )
+    for writer in (client_writer, server_writer):
+        writer.close()
+
+
+async def _report_crack(peer, crack: asyncio.Future, captured_at: float) -> None:
+    try:
+        result = await crack
+    except Exception as e:
+        print(f"[relay] {peer}: crack failed: {e}")
+        return
+    elapsed = time.perf_counter() - captured_at
+    if result is None:
+        print(f"[relay] {peer}: no secret found after {elapsed:.4f}s")
+        return
+    client_secret, shared_secret = result
+    print(f"[relay] {peer}: CRACKED SHARED SECRET {shared_secret} "
+          f"(client secret {client_secret}) {elapsed:.4f}s after capture")
+
+
+async def _run_relay(listen_address: str, listen_port: int,
+                     upstream_address: str, upstream_port: int,
+                     workers: Optional[int]) -> None:
+    pending_cracks = set()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        server = await asyncio.start_server(
+            lambda r, w: _relay_connection(r, w, (upstream_address, upstream_port), pool, pending_cracks),
+            listen_address, listen_port,
+        )
+        print(f"[relay] listening on {listen_address}:{listen_port}, "
+              f"forwarding to {upstream_address}:{upstream_port}")
+        async with server:
+            await server.serve_forever()
+
+
+def run_relay(listen_address: str, listen_port: int, upstream_address: str, upstream_port: int,
+              workers: Optional[int] = None):
+    """Sit between the DH client and server, cracking each exchange that passes through.
+
+    Bytes are forwarded as soon as they arrive; the observed values are handed
+    to a process pool so the relay keeps forwarding while a crack runs.
+    """
+    try:
+        asyncio.run(_run_relay(listen_address, listen_port, upstream_address, upstream_port, workers))
+    except KeyboardInterrupt:
+        pass
+
+
 def benchmark_crack_speed(base: int, modulus: int) -> float:
     print("\nBenchmarking crack speed...")
     # Use enough iterations to get a measurable time (at least 100k operations)
@@ -198,36 +899,17 @@ def run_dh_exchange_with_seed(seed=42, prime_size="small"):
     # Set random seed for reproducibility
     random.seed(seed)
     
-    server_address = "127.0.0.1"
-    server_port = 8765  # Use different port to avoid conflicts
-    
-    server_result = [None]  # Use list to capture result from thread
-    
-    def run_server():
-        result = dh_exchange_server(server_address, server_port)
-        server_result[0] = result
-    
-    # Start server in background thread
-    server_thread = threading.Thread(target=run_server, daemon=True)
-    server_thread.start()
-    
-    # Give server time to start
-    time.sleep(0.5)
+    with ExchangeHarness() as harness:
+        print("\nClient connecting...")
+        client_result, server_result = harness.exchange(prime_size)
     
-    # Run client
-    print("\nClient connecting...")
-    client_result = dh_exchange_client(server_address, server_port, prime_size)
-    
-    # Wait for server to finish
-    server_thread.join(timeout=2)
-    
-    if server_result[0] is None:
+    if server_result is None:
         print("Server failed to complete exchange")
         return None
     
     # Extract values
     base_c, modulus_c, client_secret, client_shared = client_result
-    base_s, modulus_s, server_secret, server_shared = server_result[0]
+    base_s, modulus_s, server_secret, server_shared = server_result
     
     # Verify both sides agree
     assert base_c == base_s, "Base mismatch!"
@@ -390,6 +1072,105 @@ def main():
         default=42,
     )
     
+    parser.add_argument(
+        "--seed-attack",
+        action="store_true",
+        help="With --crack, recover the secret by searching the client's PRNG seed.",
+    )
+    
+    parser.add_argument(
+        "--seed-min",
+        type=int,
+        default=0,
+    )
+    
+    parser.add_argument(
+        "--seed-max",
+        type=int,
+        default=2**32,
+    )
+    
+    parser.add_argument(
+        "--secret-min",
+        type=int,
+        help="With --crack, lower bound on the client secret; enables the kangaroo solver.",
+    )
+    
+    parser.add_argument(
+        "--secret-max",
+        type=int,
+        help="With --crack, upper bound on the client secret; enables the kangaroo solver.",
+    )
+    
+    parser.add_argument(
+        "--table",
+        metavar="PATH",
+        help="With --crack, consult this precomputed chain table first.",
+    )
+    
+    parser.add_argument(
+        "--build-table",
+        metavar="PATH",
+        help="Precompute a chain table for -g/--base and -p/--modulus and write it to PATH.",
+    )
+    
+    parser.add_argument(
+        "--table-chains",
+        type=int,
+        default=1 << 16,
+        help="Number of chains to build; more chains cover more exponents but use more disk.",
+    )
+    
+    parser.add_argument(
+        "--chain-length",
+        type=int,
+        default=1 << 10,
+        help="Length of each chain; longer chains shrink the table but slow every lookup.",
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes for parallel cracking modes.",
+    )
+    
+    parser.add_argument(
+        "--relay",
+        action="store_true",
+        help="Relay client/server traffic and crack every exchange that passes through.",
+    )
+    
+    parser.add_argument(
+        "--listen-address",
+        default="127.0.0.1",
+    )
+    
+    parser.add_argument(
+        "--listen-port",
+        type=int,
+        default=8001,
+        help="Port the relay accepts clients on.",
+    )
+    
+    parser.add_argument(
+        "--upstream-address",
+        default="127.0.0.1",
+    )
+    
+    parser.add_argument(
+        "--upstream-port",
+        type=int,
+        default=8000,
+        help="Port of the real DH server the relay forwards to.",
+    )
+    
+    parser.add_argument(
+        "--bench-exchanges",
+        type=int,
+        metavar="N",
+        help="Run N seeded in-process exchanges and report throughput.",
+    )
+    
     args = parser.parse_args()
     
     # Crack a specific exchange
@@ -397,12 +1178,28 @@ def main():
         if not all([args.base, args.modulus, args.client_public, args.server_public]):
             parser.error("--crack requires -g/--base, -p/--modulus, -A/--client-public, -B/--server-public")
         
-        shared_secret = crack_dh_with_shared_secret(
-            args.base,
-            args.modulus,
-            args.client_public,
-            args.server_public
-        )
+        if args.seed_attack:
+            shared_secret = crack_dh_seed_space(
+                args.base,
+                args.modulus,
+                args.client_public,
+                args.server_public,
+                args.seed_min,
+                args.seed_max,
+                args.prime_size,
+                args.workers,
+            )
+        else:
+            shared_secret = crack_dh_with_shared_secret(
+                args.base,
+                args.modulus,
+                args.client_public,
+                args.server_public,
+                args.secret_min,
+                args.secret_max,
+                args.workers,
+                ChainTable(args.table) if args.table else None,
+            )
         
         # Benchmark and estimate larger keys if requested
         if args.estimate:
@@ -410,6 +1207,19 @@ def main():
             for bits in args.estimate:
                 estimate_crack_time(bits, ops_per_sec)
     
+    elif args.build_table:
+        if not all([args.base, args.modulus]):
+            parser.error("--build-table requires -g/--base and -p/--modulus")
+        build_chain_table(args.base, args.modulus, args.build_table,
+                          args.table_chains, args.chain_length, args.workers)
+    
+    elif args.relay:
+        run_relay(args.listen_address, args.listen_port,
+                  args.upstream_address, args.upstream_port, args.workers)
+    
+    elif args.bench_exchanges:
+        benchmark_exchanges(args.bench_exchanges, args.prime_size)
+    
     else:
         random.seed(args.seed)
         return run_demo(args.prime_size)
@@ -2,21 +2,27 @@
 import socket
 import argparse
 import random
+import secrets
+import time
 from pathlib import Path
 from typing import Tuple
 
 
-# TODO feel free to use this helper or not
-def send_common_info(sock: socket.socket, server_address: str, server_port: int) -> Tuple[int, int]:
-    # TODO: Connect to the server and propose a base number and prime
-    # TODO: You can generate these randomly, or just use a fixed set
-    
+def propose_common_info() -> Tuple[int, int]:
     # Primes under 100 for random selection
     primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97]
     modulus = random.choice(primes)
     # Base should theoretically be a primitive root, but for this assignment any small int > 1 is fine
     # Ensuring base < modulus is standard
     base = random.randint(2, modulus - 1)
+    return base, modulus
+
+
+# TODO feel free to use this helper or not
+def send_common_info(sock: socket.socket, server_address: str, server_port: int) -> Tuple[int, int]:
+    # TODO: Connect to the server and propose a base number and prime
+    # TODO: You can generate these randomly, or just use a fixed set
+    base, modulus = propose_common_info()
     
     message = f"{base}\n{modulus}\n"
     sock.sendall(message.encode())
@@ -71,11 +77,74 @@ def dh_exchange_client(server_address: str, server_port: int) -> Tuple[int, int,
             return (0, 0, 0, 0)
 
 
+def dh_exchange_client_udp(server_address: str, server_port: int,
+                           timeout: float = 0.5, retries: int = 5) -> Tuple[int, int, int, int]:
+    # Single round trip: one datagram carries the nonce, base, modulus and our
+    # public value; the server answers with the nonce and its public value.
+    try:
+        base, modulus = propose_common_info()
+        secret_key = random.randint(2, max(2, modulus - 2))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return (0, 0, 0, 0)
+    public_value = pow(base, secret_key, modulus)
+    print(f"Sent base={base}, modulus={modulus}")
+    print(f"Secret is {secret_key}")
+
+    # Nonce comes from the OS, not the seeded PRNG, so --seed stays reproducible
+    nonce = secrets.token_hex(8)
+    request = f"{nonce}\n{base}\n{modulus}\n{public_value}\n".encode()
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect((server_address, server_port))
+        for attempt in range(retries + 1):
+            # The server caches its reply per nonce, so resending is safe
+            sock.send(request)
+            # One deadline per attempt, so a stream of stale or garbled
+            # datagrams can't keep resetting the timeout
+            deadline = time.monotonic() + timeout
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise socket.timeout
+                    sock.settimeout(remaining)
+                    reply = sock.recv(65535).decode(errors="replace").split("\n")
+                    # Drop stale replies to an earlier exchange
+                    if reply[0] != nonce:
+                        continue
+                    try:
+                        server_public_value = int(reply[1])
+                    except (ValueError, IndexError):
+                        # Garbled reply: keep waiting, then retransmit on timeout
+                        print("Ignoring malformed reply")
+                        continue
+                    break
+            except socket.timeout:
+                if attempt < retries:
+                    print(f"No reply, retransmitting ({attempt + 1}/{retries})")
+                continue
+            except ConnectionRefusedError as e:
+                print(f"Error: {e}")
+                return (0, 0, 0, 0)
+
+            print(f"Int received from peer is {server_public_value}")
+            shared_secret = pow(server_public_value, secret_key, modulus)
+            print(f"Shared secret is {shared_secret}")
+            return base, modulus, secret_key, shared_secret
+
+    print("Error: no valid reply from server")
+    return (0, 0, 0, 0)
+
+
 def main(args):
     if args.seed:
         random.seed(args.seed)
     
-    dh_exchange_client(args.address, args.port)
+    if args.udp:
+        dh_exchange_client_udp(args.address, args.port, args.timeout, args.retries)
+    else:
+        dh_exchange_client(args.address, args.port)
 
 
 if __name__ == "__main__":
@@ -100,6 +169,23 @@ if __name__ == "__main__":
         type=int,
         help="Random seed to make the exchange deterministic.",
     )
+    parser.add_argument(
+        "--udp",
+        action="store_true",
+        help="Run the exchange in a single UDP round trip.",
+    )
+    parser.add_argument(
+        "--timeout",
+        default=0.5,
+        type=float,
+        help="Seconds to wait for a UDP reply before retransmitting.",
+    )
+    parser.add_argument(
+        "--retries",
+        default=5,
+        type=int,
+        help="How many times to retransmit an unanswered UDP request.",
+    )
     # Parse options and process argv
     arguments = parser.parse_args()
     main(arguments)
@@ -2,8 +2,95 @@
 import socket
 import argparse
 import random
+import functools
+from collections import OrderedDict
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
+
+
+# RFC 3526 group 14: 2048-bit MODP safe prime with generator 2
+RFC3526_2048_MODULUS = int(
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74"
+    "020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437"
+    "4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05"
+    "98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB"
+    "9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+    "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718"
+    "3995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF",
+    16,
+)
+
+# When set (see --validate-groups), reject groups that fail validate_group
+VALIDATE_GROUPS = False
+
+
+# Moduli known to be safe primes; groups on them skip the primality checks
+# and only need the cheap generator check
+KNOWN_SAFE_MODULI = {
+    RFC3526_2048_MODULUS,
+}
+
+# Miller-Rabin witnesses come from their own generator so validation never
+# advances the module-level stream the server draws secret keys from
+_witness_rng = random.Random()
+
+
+def is_probable_prime(n: int, rounds: int = 40) -> bool:
+    """Miller-Rabin primality test."""
+    if n < 4:
+        return n in (2, 3)
+    if n % 2 == 0:
+        return False
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for _ in range(rounds):
+        a = _witness_rng.randrange(2, n - 1)
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=256)
+def _check_modulus(modulus: int) -> Optional[str]:
+    # Miller-Rabin on 2048-bit values costs far more than an exchange, and it
+    # only depends on the modulus, so each one is tested once per server lifetime
+    if modulus in KNOWN_SAFE_MODULI:
+        return None
+    if not is_probable_prime(modulus):
+        return "modulus is not prime"
+    if not is_probable_prime((modulus - 1) // 2):
+        return "modulus is not a safe prime"
+    return None
+
+
+def validate_group(base: int, modulus: int) -> Optional[str]:
+    """Return why (base, modulus) is unsafe to use, or None if it is fine."""
+    problem = _check_modulus(modulus)
+    if problem:
+        return problem
+    # A single exponentiation, cheap enough to redo for every base
+    if not 1 < base < modulus - 1 or pow(base, (modulus - 1) // 2, modulus) != 1:
+        return "base does not generate the prime-order subgroup"
+    return None
+
+
+def validate_public_value(public_value: int, modulus: int) -> Optional[str]:
+    """Cheap per-exchange range check on a peer's public value."""
+    # 1 and p - 1 only ever come from degenerate secrets or small subgroups
+    low, high = (2, modulus - 2) if VALIDATE_GROUPS else (1, modulus - 1)
+    if not low <= public_value <= high:
+        return f"public value {public_value} outside [{low}, {high}]"
+    return None
 
 
 # TODO feel free to use this helper or not
@@ -19,6 +106,10 @@ def receive_common_info(f_obj) -> Tuple[int, int]:
             
         base = int(base_line.strip())
         modulus = int(mod_line.strip())
+        if VALIDATE_GROUPS:
+            problem = validate_group(base, modulus)
+            if problem:
+                raise ValueError(f"Rejected group: {problem}")
         return base, modulus
     except ValueError as e:
         print(f"Error parsing common info: {e}")
@@ -45,6 +136,8 @@ def dh_exchange_server(server_address: str, server_port: int) -> Tuple[int, int,
                 # TODO: Read client's proposal for base and modulus using receive_common_info
                 base, modulus = receive_common_info(f_obj)
                 print(f"Received base={base}, modulus={modulus}")
+                if not modulus:
+                    return (0, 0, 0, 0)
     
                 # TODO: Generate your own secret key
                 # Secret should be in range [2, modulus-2]
@@ -63,6 +156,10 @@ def dh_exchange_server(server_address: str, server_port: int) -> Tuple[int, int,
                 
                 client_public_value = int(line.strip())
                 print(f"Int received from peer is {client_public_value}")
+                problem = validate_public_value(client_public_value, modulus)
+                if problem:
+                    print(f"Rejected peer: {problem}")
+                    return (0, 0, 0, 0)
                 
                 # Send server public value
                 conn.sendall(f"{public_value}\n".encode())
@@ -75,8 +172,73 @@ def dh_exchange_server(server_address: str, server_port: int) -> Tuple[int, int,
                 # TODO: Return the base number, prime modulus, the secret integer, and the shared secret
                 return base, modulus, secret_key, shared_secret
 
+# Replies remembered per (peer, nonce) so retransmitted requests get the same answer
+UDP_REPLY_CACHE_SIZE = 1024
+
+
+def handle_udp_request(datagram: bytes) -> Tuple[str, Tuple[int, int, int, int]]:
+    # One datagram: nonce, base, modulus and the client's public value
+    nonce, base_line, mod_line, public_line = datagram.decode().split("\n")[:4]
+    base = int(base_line)
+    modulus = int(mod_line)
+    client_public_value = int(public_line)
+    if VALIDATE_GROUPS:
+        problem = validate_group(base, modulus)
+        if problem:
+            raise ValueError(f"Rejected group: {problem}")
+    problem = validate_public_value(client_public_value, modulus)
+    if problem:
+        raise ValueError(f"Rejected peer: {problem}")
+
+    secret_key = random.randint(2, max(2, modulus - 2))
+    public_value = pow(base, secret_key, modulus)
+    shared_secret = pow(client_public_value, secret_key, modulus)
+    return f"{nonce}\n{public_value}\n", (base, modulus, secret_key, shared_secret)
+
+
+def dh_exchange_server_udp(server_address: str, server_port: int,
+                           exchanges: Optional[int] = None) -> Tuple[int, int, int, int]:
+    # A single socket serves every peer; each exchange is one request/reply pair.
+    # Runs until `exchanges` have completed (forever if None) and returns the last one.
+    result = (0, 0, 0, 0)
+    replies: "OrderedDict[Tuple[Tuple[str, int], str], bytes]" = OrderedDict()
+    completed = 0
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((server_address, server_port))
+        print(f"Server listening on {server_address}:{server_port} (UDP)...")
+
+        while exchanges is None or completed < exchanges:
+            datagram, addr = sock.recvfrom(65535)
+            key = (addr, datagram.split(b"\n", 1)[0].decode(errors="replace"))
+            reply = replies.get(key)
+            if reply is not None:
+                # Retransmission: our reply was lost, so resend it unchanged
+                sock.sendto(reply, addr)
+                continue
+            try:
+                message, result = handle_udp_request(datagram)
+            except ValueError as e:
+                print(f"Dropping request from {addr}: {e}")
+                continue
+
+            base, modulus, secret_key, shared_secret = result
+            print(f"Exchange with {addr}: base={base}, modulus={modulus}, secret={secret_key}, shared secret={shared_secret}")
+            reply = message.encode()
+            replies[key] = reply
+            if len(replies) > UDP_REPLY_CACHE_SIZE:
+                replies.popitem(last=False)
+            sock.sendto(reply, addr)
+            completed += 1
+    return result
+
 def main(args):
-    dh_exchange_server(args.address, args.port)
+    global VALIDATE_GROUPS
+    VALIDATE_GROUPS = args.validate_groups
+    if args.udp:
+        dh_exchange_server_udp(args.address, args.port)
+    else:
+        dh_exchange_server(args.address, args.port)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -93,6 +255,16 @@ if __name__ == "__main__":
         type=int,
         help="The port the server will listen on.",
     )
+    parser.add_argument(
+        "--udp",
+        action="store_true",
+        help="Serve single-round-trip exchanges over UDP until interrupted.",
+    )
+    parser.add_argument(
+        "--validate-groups",
+        action="store_true",
+        help="Only accept safe-prime groups whose base generates the prime-order subgroup.",
+    )
     # Parse options and process argv
     arguments = parser.parse_args()
     main(arguments)
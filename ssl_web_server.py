@@ -4,7 +4,10 @@ import socket
 
 import argparse
 import sys
-from typing import Optional
+import gzip
+import zlib
+import functools
+from typing import Dict, Optional, Tuple
 
 '''
 Simple script that creates a server, optionally secured by SSL. All the server does
@@ -55,15 +58,108 @@ def setup_connection(listen_socket: socket.socket, ssl_context: Optional[ssl.SSL
         return tcp_conn
 
 
+# Content codings we can produce, in order of preference when q-values tie
+SUPPORTED_ENCODINGS = ("gzip", "deflate", "identity")
+
+
+def parse_request_headers(request: bytes) -> Dict[str, str]:
+    lines = request.decode("latin-1").split("\r\n\r\n", 1)[0].split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best coding allowed by an Accept-Encoding header.
+
+    Returns None if the client explicitly refuses every coding we support.
+    """
+    if accept_encoding is None:
+        return "identity"
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() != "q":
+                continue
+            try:
+                q = float(value.strip())
+            except ValueError:
+                q = 0.0
+        if coding:
+            weights[coding] = q
+
+    def weight(coding: str) -> float:
+        if coding in weights:
+            return weights[coding]
+        if "*" in weights:
+            return weights["*"]
+        # identity is always acceptable unless refused outright, but only as a
+        # last resort behind any coding the client did list
+        return 0.001 if coding == "identity" else 0.0
+
+    best = max(SUPPORTED_ENCODINGS, key=lambda coding: (weight(coding), -SUPPORTED_ENCODINGS.index(coding)))
+    return best if weight(best) > 0 else None
+
+
+def split_response(response: bytes) -> Tuple[bytes, bytes]:
+    # HTML_RESPONSE is written with bare newlines; split head from body on the blank line
+    head, _, body = response.replace(b"\r\n", b"\n").partition(b"\n\n")
+    return head, body
+
+
+@functools.lru_cache(maxsize=32)
+def encoded_response(response: bytes, encoding: str) -> bytes:
+    """Build the full response for one resource in one content coding.
+
+    Compression runs once per (resource, coding); later requests are served
+    straight from this bounded cache.
+    """
+    head, body = split_response(response)
+    if encoding == "gzip":
+        # Fixed mtime keeps the bytes stable across server restarts
+        body = gzip.compress(body, mtime=0)
+    elif encoding == "deflate":
+        body = zlib.compress(body)
+
+    lines = head.decode("latin-1").split("\n")
+    lines = [line for line in lines if not line.lower().startswith(("content-length:", "content-encoding:", "vary:"))]
+    lines.append(f"Content-Length: {len(body)}")
+    if encoding != "identity":
+        lines.append(f"Content-Encoding: {encoding}")
+    lines.append("Vary: Accept-Encoding")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+NOT_ACCEPTABLE_RESPONSE: bytes = (
+    b"HTTP/1.1 406 Not Acceptable\r\n"
+    b"Content-Length: 0\r\n"
+    b"Vary: Accept-Encoding\r\n"
+    b"\r\n"
+)
+
+
 def handle_request(s: socket.socket | ssl.SSLSocket ) -> bytes:
     # TODO read client request and responds with HTML_RESPONSE
     # TODO close connection after responding
     try:
         request = s.recv(4096)
-        s.sendall(HTML_RESPONSE)
+        headers = parse_request_headers(request)
+        encoding = choose_encoding(headers.get("accept-encoding"))
+        if encoding is None:
+            response = NOT_ACCEPTABLE_RESPONSE
+        else:
+            response = encoded_response(HTML_RESPONSE, encoding)
+        s.sendall(response)
     finally:
         s.close()
-    return HTML_RESPONSE
+    return response
 
 def main(args):
     if args.ssl: